@@ -0,0 +1,92 @@
+"""
+Optional compiled kernels for the metrics.
+
+The kernels are built with numba when it is installed. Every kernel here has
+a pure NumPy counterpart in `embedding_based.metrics`, which is used otherwise.
+Corpora are passed in a ragged layout: the rows of sentence i are
+`vectors[index[offsets[i]:offsets[i + 1]]]`.
+"""
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+__all__ = [
+    "HAVE_NUMBA",
+    "extrema_cosine_batch",
+]
+
+HAVE_NUMBA = numba is not None
+
+
+def _extrema_into(vectors, index, begin, end, out):
+    """
+    Write the Extrema vector of rows `index[begin:end]` of vectors into out.
+    Leave out as zeros if the range is empty. Each row is read once, tracking
+    the maximum in out and the minimum in a scratch buffer.
+    """
+    if begin == end:
+        out[:] = 0.0
+        return
+    min_values = vectors[index[begin]].copy()
+    out[:] = min_values
+    for k in range(begin + 1, end):
+        row = vectors[index[k]]
+        for j in range(row.shape[0]):
+            v = row[j]
+            if v > out[j]:
+                out[j] = v
+            if v < min_values[j]:
+                min_values[j] = v
+    for j in range(out.shape[0]):
+        if abs(min_values[j]) > out[j]:
+            out[j] = min_values[j]
+
+
+def _extrema_cosine_batch(vectors, hyp_index, hyp_offsets, ref_index, ref_offsets, epsilon):
+    """
+    Compute the Extrema cosine similarity of every sentence pair.
+
+    :return: a tuple of (scores, keep). A pair whose hypothesis has no
+    embedding is not kept; one whose reference has none scores zero.
+    """
+    n = len(hyp_offsets) - 1
+    dim = vectors.shape[1]
+    scores = np.zeros(n, dtype=np.float64)
+    keep = np.zeros(n, dtype=np.bool_)
+    for i in numba.prange(n):
+        x = np.empty(dim, dtype=vectors.dtype)
+        y = np.empty(dim, dtype=vectors.dtype)
+        _extrema_into(vectors, hyp_index, hyp_offsets[i], hyp_offsets[i + 1], x)
+        _extrema_into(vectors, ref_index, ref_offsets[i], ref_offsets[i + 1], y)
+        # Accumulate in float64; only the extrema buffers stay in the matrix dtype.
+        xx = 0.0
+        yy = 0.0
+        xy = 0.0
+        for j in range(dim):
+            xx += x[j] * x[j]
+            yy += y[j] * y[j]
+            xy += x[j] * y[j]
+        # if none of the words in ground truth have embeddings, skip
+        if np.sqrt(xx) < epsilon:
+            continue
+        keep[i] = True
+        # if none of the words have embeddings in response, count result as zero
+        if np.sqrt(yy) < epsilon:
+            continue
+        scores[i] = xy / np.sqrt(xx * yy)
+    return scores, keep
+
+
+if HAVE_NUMBA:
+    _extrema_into = numba.njit(cache=True, fastmath=True)(_extrema_into)
+    extrema_cosine_batch = numba.njit(cache=True, fastmath=True, parallel=True)(_extrema_cosine_batch)
+else:
+    extrema_cosine_batch = None
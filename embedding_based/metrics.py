@@ -5,6 +5,14 @@ from __future__ import print_function
 
 import numpy as np
 import collections
+import functools
+import multiprocessing
+import os
+import weakref
+
+from concurrent.futures import ProcessPoolExecutor
+
+from embedding_based import _kernels
 
 __all__ = [
     "CorpusLevelScore",
@@ -14,6 +22,7 @@ __all__ = [
     "extrema_corpus_level",
     "greedy_match_corpus_level",
     "greedy_match_sentence_level",
+    "clear_embeddings_cache",
 ]
 
 _EPSILON = 0.00000000001
@@ -24,6 +33,197 @@ _95_CI_DEVIATE = 1.96
 CorpusLevelScore = collections.namedtuple('CorpusLevelScore',
                                           ['mean', 'confidence_interval', 'standard_deviation'])
 
+_Matrix = collections.namedtuple('_Matrix', ['source', 'vectors', 'key_to_index',
+                                             'sentence_sum', 'sentence_extrema'])
+
+# Per-KeyedVectors float32 matrix and sentence caches, dropped with the KeyedVectors.
+_CACHE = weakref.WeakKeyDictionary()
+
+# Number of sentence pairs padded to a common length in the NumPy Extrema path.
+_BUCKET_SIZE = 256
+
+# Number of distinct sentences whose sum and extrema are remembered per KeyedVectors.
+_SENTENCE_CACHE_SIZE = 10000
+
+
+def _make_sentence_caches(vectors, key_to_index):
+    """
+    Create the LRU-cached sentence-level reductions over a matrix.
+    Both take a tuple of tokens and return a read-only 1D ndarray.
+
+    :param vectors: the float32 matrix of a KeyedVectors.
+    :param key_to_index: the word to row mapping of a KeyedVectors.
+    :return: a tuple of (sentence_sum, sentence_extrema).
+    """
+
+    get = key_to_index.get
+
+    def lookup(tokens):
+        index = np.fromiter((get(word, -1) for word in tokens), dtype=np.int32)
+        return vectors.take(index[index != -1], axis=0)
+
+    @functools.lru_cache(maxsize=_SENTENCE_CACHE_SIZE)
+    def sentence_sum(tokens):
+        total = lookup(tokens).sum(axis=0, dtype=np.float32)
+        total.flags.writeable = False
+        return total
+
+    @functools.lru_cache(maxsize=_SENTENCE_CACHE_SIZE)
+    def sentence_extrema(tokens):
+        found = lookup(tokens)
+        if not len(found):
+            extrema = np.zeros(vectors.shape[1], dtype=np.float32)
+        else:
+            extrema = _get_extrema(found)
+        extrema.flags.writeable = False
+        return extrema
+
+    return sentence_sum, sentence_extrema
+
+
+def _get_matrix(embeddings):
+    """
+    Return the cached float32 matrix of embeddings along with its sentence caches.
+    The cache is rebuilt whenever embeddings.vectors is replaced by another array.
+    Changes made in place (e.g. `vectors *= 2` or `unit_normalize_all()`) are not
+    detected; call `clear_embeddings_cache(embeddings)` after them.
+
+    :param embeddings: a KeyedVectors.
+    :return: a _Matrix.
+    """
+    matrix = _CACHE.get(embeddings)
+    if matrix is None or matrix.source is not embeddings.vectors:
+        # A C-contiguous float32 matrix keeps row gathers contiguous. This is a no-op,
+        # without copying, for gensim's own vectors and for memory-mapped ones.
+        vectors = np.ascontiguousarray(embeddings.vectors, dtype=np.float32)
+        sentence_sum, sentence_extrema = _make_sentence_caches(vectors, embeddings.key_to_index)
+        matrix = _Matrix(
+            source=embeddings.vectors,
+            vectors=vectors,
+            key_to_index=embeddings.key_to_index,
+            sentence_sum=sentence_sum,
+            sentence_extrema=sentence_extrema,
+        )
+        _CACHE[embeddings] = matrix
+    return matrix
+
+
+def clear_embeddings_cache(embeddings=None):
+    """
+    Forget the cached matrix and sentence vectors of embeddings.
+    This is needed after modifying embeddings.vectors in place.
+
+    :param embeddings: a KeyedVectors, or None to clear the caches of all of them.
+    """
+    if embeddings is None:
+        _CACHE.clear()
+    else:
+        _CACHE.pop(embeddings, None)
+
+
+def _compile_corpus(corpus, embeddings):
+    """
+    Map a corpus to the row indices of its in-vocab words, in a ragged layout.
+    The rows of sentence i are `index[offsets[i]:offsets[i + 1]]`.
+
+    :param corpus: a list of sentences, each a list of tokens.
+    :param embeddings: a KeyedVectors.
+    :return: a tuple of (index, offsets), both 1D int64 ndarrays.
+    """
+    get = _get_matrix(embeddings).key_to_index.get
+    index = np.fromiter(
+        (get(word, -1) for sentence in corpus for word in sentence),
+        dtype=np.int64,
+    )
+    lengths = np.fromiter((len(sentence) for sentence in corpus), dtype=np.int64, count=len(corpus))
+    # Drop OOV words and count the remaining ones per sentence.
+    found = index != -1
+    sentence_of = np.repeat(np.arange(len(corpus)), lengths)
+    offsets = np.zeros(len(corpus) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sentence_of[found], minlength=len(corpus)), out=offsets[1:])
+    return index[found], offsets
+
+
+def _corpus_rows(vectors, index, offsets, i):
+    """
+    Return the embeddings of the in-vocab words of sentence i of a compiled corpus.
+
+    :param vectors: the float32 matrix of a KeyedVectors.
+    :param index: the index of a compiled corpus.
+    :param offsets: the offsets of a compiled corpus.
+    :param i: the sentence number.
+    :return: a 2D ndarray with one row per in-vocab word.
+    """
+    return vectors.take(index[offsets[i]:offsets[i + 1]], axis=0)
+
+
+def _segment_sum(vectors, index, offsets):
+    """
+    Sum the embeddings of each sentence of a compiled corpus at once.
+
+    :param vectors: the float32 matrix of a KeyedVectors.
+    :param index: the index of a compiled corpus.
+    :param offsets: the offsets of a compiled corpus.
+    :return: a 2D ndarray with one sum per sentence, zeros for empty ones.
+    """
+    sums = np.zeros((len(offsets) - 1, vectors.shape[1]), dtype=np.float32)
+    # reduceat cannot express empty segments, so only start the non-empty ones;
+    # each then runs up to the start of the next non-empty sentence.
+    non_empty = offsets[1:] > offsets[:-1]
+    if non_empty.any():
+        sums[non_empty] = np.add.reduceat(
+            vectors.take(index, axis=0), offsets[:-1][non_empty], axis=0, dtype=np.float32,
+        )
+    return sums
+
+
+# The KeyedVectors of a worker process, set once by _init_worker.
+_WORKER_EMBEDDINGS = None
+
+
+def _init_worker(embeddings):
+    global _WORKER_EMBEDDINGS
+    _WORKER_EMBEDDINGS = embeddings
+
+
+def _score_chunk(score_fn, hypothesis_corpus, reference_corpus):
+    return score_fn(hypothesis_corpus, reference_corpus, _WORKER_EMBEDDINGS)
+
+
+def _map_chunks(score_fn, hypothesis_corpus, reference_corpus, embeddings, n_jobs):
+    """
+    Apply score_fn to the corpus, split into chunks over n_jobs processes.
+    Each worker receives a pickled copy of the whole embeddings once, so memory
+    grows by the size of the model per worker. Workers are spawned rather than
+    forked so that thread pools already running in this process (numba, BLAS)
+    are not inherited in a broken state.
+
+    :param score_fn: a callable taking two corpora and embeddings, returning an 1D ndarray of scores.
+    :param hypothesis_corpus:
+    :param reference_corpus:
+    :param embeddings: a KeyedVectors.
+    :param n_jobs: number of processes. None or a negative value means all CPUs.
+    :return: the concatenated scores of all chunks, in corpus order.
+    """
+    assert len(hypothesis_corpus) == len(reference_corpus)
+    if n_jobs == 0:
+        raise ValueError('n_jobs must be a positive number, a negative number or None, got 0')
+    if n_jobs is None or n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs == 1 or len(hypothesis_corpus) < 2:
+        return score_fn(hypothesis_corpus, reference_corpus, embeddings)
+
+    chunk_size = max(1, len(hypothesis_corpus) // (4 * n_jobs))
+    starts = range(0, len(hypothesis_corpus), chunk_size)
+    with ProcessPoolExecutor(n_jobs, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(embeddings,)) as executor:
+        chunks = executor.map(
+            functools.partial(_score_chunk, score_fn),
+            [hypothesis_corpus[i:i + chunk_size] for i in starts],
+            [reference_corpus[i:i + chunk_size] for i in starts],
+        )
+        return np.concatenate(list(chunks))
+
 
 def _compute_corpus_score(scores):
     """
@@ -31,13 +231,15 @@ def _compute_corpus_score(scores):
     The scores come from evaluating a list of sentence pairs.
     The function combines them by mean and standard derivation.
 
-    :param scores: a list of float.
+    :param scores: a list or 1D ndarray of float.
     :return: a CorpusLevelScore.
     """
+    scores = np.asarray(scores, dtype=np.float64)
+    std = scores.std()
     return CorpusLevelScore(
-        mean=np.mean(scores),
-        confidence_interval=_95_CI_DEVIATE * np.std(scores) / len(scores),
-        standard_deviation=np.std(scores),
+        mean=scores.mean(),
+        confidence_interval=_95_CI_DEVIATE * std / np.sqrt(scores.size),
+        standard_deviation=std,
     )
 
 
@@ -49,12 +251,41 @@ def _cos_sim(a, b):
     :param b: ndarray of 1D.
     :return: float.
     """
-    a_norm = np.linalg.norm(a)
-    b_norm = np.linalg.norm(b)
-    if a_norm < _EPSILON or b_norm < _EPSILON:
+    # Accumulate in float64 even for float32 sentence vectors.
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    a_square = np.dot(a, a)
+    b_square = np.dot(b, b)
+    if a_square < _EPSILON ** 2 or b_square < _EPSILON ** 2:
         # zero in, zero out.
-        return 0
-    return np.dot(a, b) / np.linalg.norm(a) / np.linalg.norm(b)
+        return 0.0
+    return float(np.dot(a, b) / np.sqrt(a_square * b_square))
+
+
+def _cosine_scores(X, Y):
+    """
+    Compute the cosine similarity of each row of X to the same row of Y.
+    Rows of X that are zero are left out; zero rows of Y score zero.
+
+    :param X: a 2D ndarray of hypothesis sentence vectors.
+    :param Y: a 2D ndarray of reference sentence vectors.
+    :return: an 1D ndarray of scores.
+    """
+    X_norm = np.linalg.norm(X, axis=1)
+    Y_norm = np.linalg.norm(Y, axis=1)
+    # if none of the words in ground truth have embeddings, skip
+    keep = X_norm >= _EPSILON
+    X, Y, X_norm, Y_norm = X[keep], Y[keep], X_norm[keep], Y_norm[keep]
+
+    # if none of the words have embeddings in response, count result as zero
+    valid = Y_norm >= _EPSILON
+    scores = np.zeros(len(X))
+
+    # Normalize to unit vectors.
+    X = X[valid] / X_norm[valid, None]
+    Y = Y[valid] / Y_norm[valid, None]
+    scores[valid] = np.einsum('ij,ij->i', X, Y, dtype=np.float64)
+    return scores
 
 
 def _embedding_sum(sentence, embeddings):
@@ -63,17 +294,16 @@ def _embedding_sum(sentence, embeddings):
 
     :param sentence: a list of tokens.
     :param embeddings: a KeyedVectors.
-    :return: a 1D ndarray of len `embeddings.vector_size`.
+    :return: a read-only 1D ndarray of len `embeddings.vector_size`.
     """
-    total = sum(_map_to_embeddings(sentence, embeddings))
-    return total
+    return _get_matrix(embeddings).sentence_sum(tuple(sentence))
 
 
 def _get_average(sentence, embeddings):
     total = _embedding_sum(sentence, embeddings)
     total_norm = np.linalg.norm(total)
     if total_norm < _EPSILON:
-        return np.zeros(embeddings.vector_size)
+        return np.zeros(embeddings.vector_size, dtype=np.float32)
     return total / total_norm
 
 
@@ -92,35 +322,34 @@ def average_sentence_level(hypothesis_sentence, reference_sentence, embeddings):
     )
 
 
-def average_corpus_level(hypothesis_corpus, reference_corpus, embeddings):
+def _average_scores(hypothesis_corpus, reference_corpus, embeddings):
+    """
+    Compute the Average score of every sentence pair of the corpus.
+    Pairs whose hypothesis has no embedding are left out.
+
+    :return: an 1D ndarray of scores.
+    """
+    assert len(hypothesis_corpus) == len(reference_corpus)
+    vectors = _get_matrix(embeddings).vectors
+    hyp_index, hyp_offsets = _compile_corpus(hypothesis_corpus, embeddings)
+    ref_index, ref_offsets = _compile_corpus(reference_corpus, embeddings)
+    return _cosine_scores(
+        _segment_sum(vectors, hyp_index, hyp_offsets),
+        _segment_sum(vectors, ref_index, ref_offsets),
+    )
+
+
+def average_corpus_level(hypothesis_corpus, reference_corpus, embeddings, n_jobs=1):
     """
     Compute Average on corpus level.
 
     :param hypothesis_corpus:
     :param reference_corpus:
     :param embeddings:
+    :param n_jobs: number of processes to score the corpus with.
     :return:
     """
-    assert len(hypothesis_corpus) == len(reference_corpus)
-    scores = []
-
-    for hypothesis, reference in zip(hypothesis_corpus, reference_corpus):
-        X = _embedding_sum(hypothesis, embeddings)
-        Y = _embedding_sum(reference, embeddings)
-        # if none of the words in ground truth have embeddings, skip
-        if np.linalg.norm(X) < _EPSILON:
-            continue
-
-        # if none of the words have embeddings in response, count result as zero
-        if np.linalg.norm(Y) < _EPSILON:
-            scores.append(0)
-            continue
-
-        # Normalize to unit vectors.
-        X /= np.linalg.norm(X)
-        Y /= np.linalg.norm(Y)
-        scores.append(_cos_sim(X, Y))
-
+    scores = _map_chunks(_average_scores, hypothesis_corpus, reference_corpus, embeddings, n_jobs)
     return _compute_corpus_score(scores)
 
 
@@ -131,31 +360,85 @@ def _get_extrema(vectors):
     :param vectors: a list of 1D vectors all having the same shape.
     :return: the Extrema vector.
     """
-    max_values = np.max(vectors, axis=0)
-    min_values = np.min(vectors, axis=0)
-    return np.array([
-        min_v if np.abs(min_v) > max_v else max_v
-        for min_v, max_v in zip(min_values, max_values)
-    ])
+    return _get_extrema_along(np.asarray(vectors), axis=0)
+
+
+def _get_extrema_along(vectors, axis):
+    """
+    Compute the Extrema vectors of an ndarray, reducing the word axis.
+    """
+    max_values = np.maximum.reduce(vectors, axis=axis)
+    min_values = np.minimum.reduce(vectors, axis=axis)
+    return np.where(np.abs(min_values) > max_values, min_values, max_values)
+
+
+def _bucket_by_length(hyp_offsets, ref_offsets, bucket_size=_BUCKET_SIZE):
+    """
+    Group the sentence pairs of two compiled corpora into buckets of similar length.
+
+    :param hyp_offsets: the offsets of the compiled hypothesis corpus.
+    :param ref_offsets: the offsets of the compiled reference corpus.
+    :param bucket_size: the maximum number of pairs per bucket.
+    :return: a list of 1D ndarrays of pair numbers.
+    """
+    lengths = np.maximum(np.diff(hyp_offsets), np.diff(ref_offsets))
+    order = np.argsort(lengths, kind='stable')
+    return [order[i:i + bucket_size] for i in range(0, len(order), bucket_size)]
+
+
+def _bucket_extrema(vectors, index, offsets, sentences):
+    """
+    Compute the Extrema vectors of some sentences of a compiled corpus at once.
+    The sentences are padded to the same length by repeating their first word,
+    which changes neither their maximum nor their minimum.
+
+    :param vectors: the float32 matrix of a KeyedVectors.
+    :param index: the index of a compiled corpus.
+    :param offsets: the offsets of a compiled corpus.
+    :param sentences: a 1D ndarray of sentence numbers.
+    :return: a 2D ndarray with one Extrema vector per sentence, zeros for empty ones.
+    """
+    begins = offsets[sentences]
+    lengths = offsets[sentences + 1] - begins
+    if not lengths.any():
+        return np.zeros((len(sentences), vectors.shape[1]), dtype=vectors.dtype)
+    positions = np.arange(lengths.max())
+    positions = np.where(positions < lengths[:, None], positions, 0)
+    # Empty sentences read any valid row and are zeroed below.
+    padded = index[np.minimum(begins[:, None] + positions, len(index) - 1)]
+    tensor = vectors[padded]
+    extrema = _get_extrema_along(tensor, axis=1)
+    extrema[lengths == 0] = 0
+    return extrema
+
+
+def _sentence_extrema(sentence, embeddings):
+    """
+    Return the Extrema vector of the in-vocab words in sentence.
+    A sentence without any in-vocab word gets all zeros.
+
+    :param sentence: a list of tokens.
+    :param embeddings: a KeyedVectors.
+    :return: a read-only 1D ndarray of len `embeddings.vector_size`.
+    """
+    return _get_matrix(embeddings).sentence_extrema(tuple(sentence))
 
 
 def _map_to_embeddings(words, embeddings):
     """
-    Map each word in words to its embedding. OOV word maps to zeros.
-    Thus the dimension of words may not match that of the returned list.
+    Map each in-vocab word in words to its embedding. OOV words are dropped.
+    Thus the length of words may not match that of the returned array.
 
     :param words: a list of strings.
     :param embeddings: a gensim KeyedVectors.
-    :return:  a list of ndarrays.
+    :return: a 2D ndarray with one row per in-vocab word.
     """
-
-    def get(word):
-        try:
-            return embeddings[word]
-        except KeyError:
-            return np.zeros(embeddings.vector_size)
-
-    return list(map(get, words))
+    matrix = _get_matrix(embeddings)
+    if not len(words):
+        return matrix.vectors[:0]
+    get = matrix.key_to_index.get
+    index = np.fromiter((get(word, -1) for word in words), dtype=np.int32)
+    return matrix.vectors.take(index[index >= 0], axis=0)
 
 
 def extrema_sentence_level(hypothesis_sentence, reference_sentence, embeddings):
@@ -167,38 +450,82 @@ def extrema_sentence_level(hypothesis_sentence, reference_sentence, embeddings):
     :param embeddings:
     :return:
     """
-    hypothesis = _map_to_embeddings(hypothesis_sentence, embeddings)
-    reference = _map_to_embeddings(reference_sentence, embeddings)
     return _cos_sim(
-        a=_get_extrema(hypothesis),
-        b=_get_extrema(reference),
+        a=_sentence_extrema(hypothesis_sentence, embeddings),
+        b=_sentence_extrema(reference_sentence, embeddings),
     )
 
 
-def extrema_corpus_level(hypothesis_corpus, reference_corpus, embeddings):
+def _extrema_scores(hypothesis_corpus, reference_corpus, embeddings):
+    """
+    Compute the Extrema score of every sentence pair of the corpus.
+    Pairs whose hypothesis has no embedding are left out.
+
+    :return: an 1D ndarray of scores.
+    """
+    vectors = _get_matrix(embeddings).vectors
+    hyp_index, hyp_offsets = _compile_corpus(hypothesis_corpus, embeddings)
+    ref_index, ref_offsets = _compile_corpus(reference_corpus, embeddings)
+    if _kernels.HAVE_NUMBA:
+        scores, keep = _kernels.extrema_cosine_batch(
+            vectors,
+            hyp_index, hyp_offsets,
+            ref_index, ref_offsets,
+            _EPSILON,
+        )
+        return scores[keep]
+
+    shape = (len(hypothesis_corpus), embeddings.vector_size)
+    X = np.zeros(shape, dtype=np.float32)
+    Y = np.zeros(shape, dtype=np.float32)
+    for pairs in _bucket_by_length(hyp_offsets, ref_offsets):
+        X[pairs] = _bucket_extrema(vectors, hyp_index, hyp_offsets, pairs)
+        Y[pairs] = _bucket_extrema(vectors, ref_index, ref_offsets, pairs)
+    # The extrema is zero exactly when all the word vectors are zero.
+    return _cosine_scores(X, Y)
+
+
+def extrema_corpus_level(hypothesis_corpus, reference_corpus, embeddings, n_jobs=1):
     """
     Compute Extrema on corpus level.
 
     :param hypothesis_corpus:
     :param reference_corpus:
     :param embeddings:
+    :param n_jobs: number of processes to score the corpus with. Ignored when numba
+        is installed, since the compiled kernel already runs on all cores.
     :return:
     """
-    scores = []
-    for hypothesis, reference in zip(hypothesis_corpus, reference_corpus):
-        X = _map_to_embeddings(hypothesis, embeddings)
-        Y = _map_to_embeddings(reference, embeddings)
+    if _kernels.HAVE_NUMBA:
+        n_jobs = 1
+    scores = _map_chunks(_extrema_scores, hypothesis_corpus, reference_corpus, embeddings, n_jobs)
+    return _compute_corpus_score(scores)
 
-        if np.linalg.norm(X) < _EPSILON:
-            continue
-        if np.linalg.norm(Y) < _EPSILON:
-            scores.append(0)
-            continue
 
-        value = _cos_sim(_get_extrema(X), _get_extrema(Y))
-        scores.append(value)
+def _unit_rows(vectors):
+    """
+    Normalize each row of a list of vectors to a unit vector.
+    Zero rows stay zero, so their cosine similarity with anything is zero.
+
+    :param vectors: a list of word vectors.
+    :return: a 2D float64 ndarray.
+    """
+    vectors = np.asarray(vectors, dtype=np.float64)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms >= _EPSILON)
 
-    return _compute_corpus_score(scores)
+
+def _cos_sim_matrix(a, b):
+    """
+    Return the cosine similarity of every vector in a to every vector in b.
+
+    :param a: a non-empty list of word vectors.
+    :param b: a non-empty list of word vectors.
+    :return: a 2D ndarray of shape (len(a), len(b)).
+    """
+    if not len(a) or not len(b):
+        raise ValueError('empty vector')
+    return _unit_rows(a) @ _unit_rows(b).T
 
 
 def _greedy_match(a, b):
@@ -210,14 +537,7 @@ def _greedy_match(a, b):
     :param b: a list of word vectors.
     :return: The greedy-matched value.
     """
-    sum_max_cosine = sum(
-        max(
-            _cos_sim(a_i, b_i) for b_i in b
-        ) for a_i in a
-    )
-    if not len(a):
-        raise ValueError('empty vector')
-    return sum_max_cosine / len(a)
+    return float(_cos_sim_matrix(a, b).max(axis=1).mean())
 
 
 def _greedy_average(a, b):
@@ -228,8 +548,9 @@ def _greedy_average(a, b):
     :param b: a list of word vectors.
     :return: The averaged greedy-matched value.
     """
-    # return np.mean([_greedy_match(*args) for args in ((a, b), (b, a))])
-    return (_greedy_match(a, b) + _greedy_match(b, a)) / 2
+    # Both directions share one similarity matrix.
+    similarity = _cos_sim_matrix(a, b)
+    return float(similarity.max(axis=1).mean() + similarity.max(axis=0).mean()) / 2
 
 
 def greedy_match_sentence_level(hypothesis_sentence, reference_sentence, embeddings):
@@ -243,6 +564,9 @@ def greedy_match_sentence_level(hypothesis_sentence, reference_sentence, embeddi
     """
     hyp = _map_to_embeddings(hypothesis_sentence, embeddings)
     ref = _map_to_embeddings(reference_sentence, embeddings)
+    if len(hypothesis_sentence) and len(reference_sentence) and (not len(hyp) or not len(ref)):
+        # One side has only OOV words, so every cosine is zero.
+        return 0.0
     return _greedy_average(hyp, ref)
 
 
@@ -255,10 +579,13 @@ def greedy_match_corpus_level(hypothesis_corpus, reference_corpus, embeddings):
     :param embeddings:
     :return:
     """
+    vectors = _get_matrix(embeddings).vectors
+    hyp_index, hyp_offsets = _compile_corpus(hypothesis_corpus, embeddings)
+    ref_index, ref_offsets = _compile_corpus(reference_corpus, embeddings)
     scores = []
-    for hypothesis, reference in zip(hypothesis_corpus, reference_corpus):
-        X = _map_to_embeddings(hypothesis, embeddings)
-        Y = _map_to_embeddings(reference, embeddings)
+    for i in range(len(hypothesis_corpus)):
+        X = _corpus_rows(vectors, hyp_index, hyp_offsets, i)
+        Y = _corpus_rows(vectors, ref_index, ref_offsets, i)
         if len(X) == 0 or len(Y) == 0:
             scores.append(0)
             continue
@@ -10,8 +10,12 @@ from embedding_based.utils import load_corpus_from_file
 
 from embedding_based.metrics import _embedding_sum
 from embedding_based.metrics import _get_average
+from embedding_based.metrics import _compile_corpus
+from embedding_based.metrics import _get_matrix
+from embedding_based.metrics import _segment_sum
 
 from embedding_based.metrics import average_sentence_level
+from embedding_based.metrics import clear_embeddings_cache
 from embedding_based.metrics import average_corpus_level
 
 
@@ -56,3 +60,32 @@ class TestAverage(unittest.TestCase):
         # since our predicted is a shuffle of ground truth and average_score ignores order, the average_score of them
         # must equal.
         self.assertAlmostEqual(score[0], 1.0)
+
+    def test_average_corpus_level_n_jobs(self):
+        hypothesis_corpus = load_corpus_from_file(PREDICTED)
+        reference_corpus = load_corpus_from_file(GROUND_TRUTH)[::-1]
+        expected = average_corpus_level(hypothesis_corpus, reference_corpus, self.embeddings)
+        score = average_corpus_level(hypothesis_corpus, reference_corpus, self.embeddings, n_jobs=2)
+        for ours, theirs in zip(score, expected):
+            self.assertAlmostEqual(ours, theirs)
+
+    def test_average_corpus_level_zero_jobs(self):
+        corpus = load_corpus_from_file(PREDICTED)
+        with self.assertRaises(ValueError):
+            average_corpus_level(corpus, corpus, self.embeddings, n_jobs=0)
+
+    def test_embedding_sum_after_inplace_change(self):
+        embeddings = load_word2vec_binary(EMBEDDINGS)
+        sentence = ['computer', 'trees']
+        before = _embedding_sum(sentence, embeddings).copy()
+        embeddings.vectors *= 2
+        clear_embeddings_cache(embeddings)
+        self.assertTrue(np.allclose(_embedding_sum(sentence, embeddings), 2 * before),
+                        msg='cleared cache sees in-place changes')
+
+    def test_segment_sum(self):
+        corpus = [[], ['human', 'trees'], ['foo'], ['computer'], []]
+        index, offsets = _compile_corpus(corpus, self.embeddings)
+        sums = _segment_sum(_get_matrix(self.embeddings).vectors, index, offsets)
+        for total, sentence in zip(sums, corpus):
+            self.assertTrue(np.allclose(total, _embedding_sum(sentence, self.embeddings)))
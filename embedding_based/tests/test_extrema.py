@@ -1,10 +1,20 @@
 import unittest
+import unittest.mock
 import numpy as np
 
+from embedding_based import _kernels
+from embedding_based.metrics import _EPSILON
+from embedding_based.metrics import _compile_corpus
 from embedding_based.metrics import _get_extrema
+from embedding_based.metrics import _get_matrix
+from embedding_based.metrics import extrema_corpus_level
+from embedding_based.metrics import _sentence_extrema
 from embedding_based.metrics import extrema_sentence_level
 from embedding_based.tests import EMBEDDINGS
+from embedding_based.tests import GROUND_TRUTH
+from embedding_based.tests import PREDICTED
 from embedding_based.utils import load_word2vec_binary
+from embedding_based.utils import load_corpus_from_file
 
 
 class TestExtrema(unittest.TestCase):
@@ -24,3 +34,59 @@ class TestExtrema(unittest.TestCase):
         score_1 = extrema_sentence_level('computer eps eps'.split(), reference, self.embeddings)
         score_2 = extrema_sentence_level('eps eps eps'.split(), reference, self.embeddings)
         self.assertGreater(score_2, score_1)
+
+    def test_sentence_extrema(self):
+        sentence = 'computer foo trees'.split()
+        extrema = _sentence_extrema(sentence, self.embeddings)
+        expected = _get_extrema([self.embeddings['computer'], self.embeddings['trees']])
+        self.assertTrue(np.allclose(extrema, expected), msg='OOV words are ignored')
+        self.assertIs(extrema, _sentence_extrema(list(sentence), self.embeddings),
+                      msg='repeated sentence hits the cache')
+        self.assertFalse(_sentence_extrema(['foo'], self.embeddings).any())
+
+    @unittest.skipUnless(_kernels.HAVE_NUMBA, 'numba is not installed')
+    def test_extrema_cosine_batch(self):
+        hypothesis_corpus = load_corpus_from_file(PREDICTED) + [['foo'], ['computer']]
+        reference_corpus = load_corpus_from_file(GROUND_TRUTH) + [['computer'], ['foo']]
+        hyp_index, hyp_offsets = _compile_corpus(hypothesis_corpus, self.embeddings)
+        ref_index, ref_offsets = _compile_corpus(reference_corpus, self.embeddings)
+        scores, keep = _kernels.extrema_cosine_batch(
+            vectors=_get_matrix(self.embeddings).vectors,
+            hyp_index=hyp_index,
+            hyp_offsets=hyp_offsets,
+            ref_index=ref_index,
+            ref_offsets=ref_offsets,
+            epsilon=_EPSILON,
+        )
+        self.assertEqual(keep.tolist(), [True] * (len(keep) - 2) + [False, True])
+        for score, hypothesis, reference in zip(scores, hypothesis_corpus, reference_corpus):
+            expected = extrema_sentence_level(hypothesis, reference, self.embeddings)
+            self.assertAlmostEqual(score, expected, places=5)
+
+    def test_extrema_corpus_level_n_jobs(self):
+        hypothesis_corpus = load_corpus_from_file(PREDICTED)
+        reference_corpus = load_corpus_from_file(GROUND_TRUTH)[::-1]
+        expected = extrema_corpus_level(hypothesis_corpus, reference_corpus, self.embeddings)
+        score = extrema_corpus_level(hypothesis_corpus, reference_corpus, self.embeddings, n_jobs=2)
+        for ours, theirs in zip(score, expected):
+            self.assertAlmostEqual(ours, theirs)
+
+    @unittest.skipUnless(_kernels.HAVE_NUMBA, 'numba is not installed')
+    def test_extrema_corpus_level_numpy_fallback(self):
+        hypothesis_corpus = load_corpus_from_file(PREDICTED) + [['foo'], ['computer']]
+        reference_corpus = load_corpus_from_file(GROUND_TRUTH)[::-1] + [['computer'], ['foo']]
+        expected = extrema_corpus_level(hypothesis_corpus, reference_corpus, self.embeddings)
+        with unittest.mock.patch.object(_kernels, 'HAVE_NUMBA', False):
+            score = extrema_corpus_level(hypothesis_corpus, reference_corpus, self.embeddings)
+        for ours, theirs in zip(score, expected):
+            self.assertAlmostEqual(ours, theirs, places=6)
+
+    def test_extrema_corpus_level_empty_sentences(self):
+        score = extrema_corpus_level(
+            [[], ['computer'], ['computer']],
+            [['computer'], [], ['computer']],
+            self.embeddings,
+        )
+        # The empty hypothesis is skipped, the empty reference scores zero.
+        self.assertAlmostEqual(score.mean, 0.5, places=6)
+        self.assertAlmostEqual(score.standard_deviation, 0.5, places=6)
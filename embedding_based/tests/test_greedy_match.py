@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+
+from embedding_based.metrics import _cos_sim
+from embedding_based.metrics import _greedy_average
+from embedding_based.metrics import _greedy_match
+from embedding_based.metrics import greedy_match_sentence_level
+from embedding_based.tests import EMBEDDINGS
+from embedding_based.utils import load_word2vec_binary
+
+
+class TestGreedyMatch(unittest.TestCase):
+    embeddings = load_word2vec_binary(EMBEDDINGS)
+
+    def test_greedy_match(self):
+        a = [self.embeddings[word] for word in 'computer trees graph'.split()]
+        b = [self.embeddings[word] for word in 'human trees'.split()]
+        expected = np.mean([max(_cos_sim(a_i, b_i) for b_i in b) for a_i in a])
+        self.assertAlmostEqual(_greedy_match(a, b), expected)
+        self.assertAlmostEqual(_greedy_average(a, b), (_greedy_match(a, b) + _greedy_match(b, a)) / 2)
+
+    def test_greedy_match_zero_vector(self):
+        a = [np.zeros(3), np.array([1.0, 0.0, 0.0])]
+        b = [np.array([1.0, 0.0, 0.0])]
+        self.assertAlmostEqual(_greedy_match(a, b), 0.5, msg='zero vector matches with zero cosine')
+
+    def test_greedy_match_empty(self):
+        with self.assertRaises(ValueError):
+            _greedy_match([], [self.embeddings['computer']])
+        with self.assertRaises(ValueError):
+            greedy_match_sentence_level([], ['computer'], self.embeddings)
+
+    def test_greedy_match_sentence_level(self):
+        self.assertEqual(greedy_match_sentence_level(['foo'], ['computer'], self.embeddings), 0.0)
+        self.assertAlmostEqual(
+            greedy_match_sentence_level(['computer', 'trees'], ['trees', 'computer'], self.embeddings), 1.0
+        )
@@ -1,7 +1,10 @@
 import unittest
 import numpy as np
 
+from embedding_based.metrics import _compile_corpus
+from embedding_based.metrics import _compute_corpus_score
 from embedding_based.metrics import _cos_sim
+from embedding_based.metrics import _get_matrix
 from embedding_based.metrics import _map_to_embeddings
 
 from embedding_based.tests import EMBEDDINGS
@@ -23,7 +26,33 @@ class TestMetricHelpers(unittest.TestCase):
         self.assertAlmostEqual(
             _cos_sim(identity, orthogonal), 0.0
         )
+        tiny = np.array([1e-6, 0.0], dtype=np.float32)
+        self.assertAlmostEqual(_cos_sim(tiny, tiny), 1.0, msg='only a zero operand gives zero')
+        huge = np.array([1e15, 1e15], dtype=np.float32)
+        self.assertAlmostEqual(_cos_sim(huge, huge), 1.0, msg='no float32 overflow')
+        self.assertAlmostEqual(_cos_sim(huge * 1e15, huge * 1e15), 1.0, msg='dot products in float64')
 
     def test_map_to_embeddings(self):
         self.assertTrue(len(_map_to_embeddings(['foo', 'bar'], self.embeddings)) == 0)
         self.assertTrue(len(_map_to_embeddings(['computer', 'trees', 'graph'], self.embeddings)) == 3)
+
+    def test_get_matrix(self):
+        matrix = _get_matrix(self.embeddings)
+        self.assertIs(matrix, _get_matrix(self.embeddings), msg='matrix is cached per KeyedVectors')
+        self.assertEqual(matrix.vectors.dtype, np.float32)
+        self.assertEqual(matrix.vectors.shape, self.embeddings.vectors.shape)
+
+    def test_compile_corpus(self):
+        corpus = [[], ['human', 'foo', 'trees'], ['foo'], ['human']]
+        index, offsets = _compile_corpus(corpus, self.embeddings)
+        human = self.embeddings.key_to_index['human']
+        trees = self.embeddings.key_to_index['trees']
+        self.assertEqual(index.tolist(), [human, trees, human])
+        self.assertEqual(offsets.tolist(), [0, 0, 2, 2, 3])
+
+    def test_compute_corpus_score(self):
+        score = _compute_corpus_score([0.0, 1.0, 0.0, 1.0])
+        self.assertAlmostEqual(score.mean, 0.5)
+        self.assertAlmostEqual(score.standard_deviation, 0.5)
+        self.assertAlmostEqual(score.confidence_interval, 1.96 * 0.5 / 2.0,
+                               msg='confidence interval shrinks with sqrt(n)')
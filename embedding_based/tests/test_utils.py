@@ -1,7 +1,14 @@
+import os
+import tempfile
 import unittest
 
+import numpy as np
+
 from embedding_based.utils import load_word2vec_binary
 from embedding_based.utils import load_corpus_from_file
+from embedding_based.utils import load_keyed_vectors
+from embedding_based.metrics import _get_matrix
+from embedding_based.metrics import average_sentence_level
 
 from embedding_based.tests import EMBEDDINGS
 from embedding_based.tests import VOCAB
@@ -19,4 +26,18 @@ class TestUtils(unittest.TestCase):
     def test_load_corpus(self):
         corpus = load_corpus_from_file(GROUND_TRUTH)
         self.assertTrue(isinstance(corpus, list))
-        self.assertTrue(isinstance(corpus[0], list))
\ No newline at end of file
+        self.assertTrue(isinstance(corpus[0], list))
+    def test_load_keyed_vectors_mmap(self):
+        embeddings = load_word2vec_binary(EMBEDDINGS)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'word_vecs.kv')
+            embeddings.save(path, sep_limit=0)
+            mapped = load_keyed_vectors(path, mmap='r')
+            self.assertTrue(np.shares_memory(_get_matrix(mapped).vectors, mapped.vectors),
+                            msg='the memory-mapped matrix is used without a copy')
+            sentences = ('computer trees graph'.split(), 'human system'.split())
+            self.assertAlmostEqual(
+                average_sentence_level(*sentences, mapped),
+                average_sentence_level(*sentences, embeddings),
+            )
+            del mapped
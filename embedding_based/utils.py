@@ -3,12 +3,14 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 from __future__ import print_function
 
+from gensim.models.keyedvectors import KeyedVectors
 from gensim.models.keyedvectors import Word2VecKeyedVectors
 
 __all__ = [
     "load_corpus_from_file",
     "apply_metric_on_files",
     "load_word2vec_binary",
+    "load_keyed_vectors",
 ]
 
 
@@ -44,3 +46,16 @@ def load_word2vec_binary(file):
     :return: KeyedVectors
     """
     return Word2VecKeyedVectors.load_word2vec_format(file, binary=True)
+
+
+def load_keyed_vectors(file, mmap=None):
+    """
+    Load embeddings saved by gensim's KeyedVectors.save().
+    With mmap='r' the vectors are memory-mapped, so only the rows of words that are
+    actually looked up get paged in. Save with `sep_limit=0` to make sure the vectors
+    are stored in a separate file that can be mapped.
+    :param file: a file written by KeyedVectors.save().
+    :param mmap: None to read the vectors into memory, 'r' to memory-map them.
+    :return: KeyedVectors
+    """
+    return KeyedVectors.load(file, mmap=mmap)
@@ -32,4 +32,7 @@ setup(
     license='LICENCE.txt',
     long_description=open('README.md').read(),
     install_requires=['gensim', 'numpy'],
+    extras_require={
+        'numba': ['numba'],
+    },
 )